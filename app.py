@@ -1,16 +1,45 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from flask_migrate import Migrate
 import redis
-import json
+import orjson
+import fastjsonschema
 from datetime import datetime, timezone
 from typing import List, Optional
 import os
+import time
+import uuid
+import threading
+from cachetools import TTLCache
 from werkzeug.exceptions import BadRequest, NotFound, InternalServerError
 from flasgger import Swagger
 
+# orjson serialization: naive datetimes are treated as UTC, anything else
+# orjson can't handle natively falls back to str()
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+def dumps_json(data) -> bytes:
+    return orjson.dumps(data, default=str, option=ORJSON_OPTIONS)
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, used by jsonify and request.get_json"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps_json(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_json(obj), mimetype='application/json')
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Swagger Configuration
 swagger_config = {
@@ -65,19 +94,38 @@ swagger = Swagger(app, config=swagger_config, template=swagger_template)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///book_reviews.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Connection pool sizing for server databases (SQLite keeps Flask-SQLAlchemy's pool setup)
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 40)),
+        'pool_pre_ping': True,
+        'pool_recycle': 300
+    }
+
 # Redis Configuration
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 64))
 
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 
 # Initialize Redis
 try:
-    redis_client = redis.from_url(REDIS_URL)
+    redis_pool = redis.ConnectionPool.from_url(
+        REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS, socket_keepalive=True
+    )
+    redis_client = redis.Redis(connection_pool=redis_pool)
     redis_client.ping()
 except redis.exceptions.ConnectionError:
       app.logger.error("Reddis server not connected")
 
+# Response field order for serialized books and reviews. Rows selected in this
+# column order are zipped straight into dicts; created_at stays a datetime and
+# is formatted by the orjson encoder.
+BOOK_FIELDS = ('id', 'title', 'author', 'isbn', 'publication_year', 'created_at')
+REVIEW_FIELDS = ('id', 'book_id', 'reviewer_name', 'rating', 'review_text', 'created_at')
+
 # Models
 class Book(db.Model):
     __tablename__ = 'books'
@@ -90,17 +138,7 @@ class Book(db.Model):
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     
     # Relationship with reviews
-    reviews = db.relationship('Review', backref='book', lazy=True, cascade='all, delete-orphan')
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'author': self.author,
-            'isbn': self.isbn,
-            'publication_year': self.publication_year,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+    reviews = db.relationship('Review', back_populates='book', cascade='all, delete-orphan')
 
 class Review(db.Model):
     __tablename__ = 'reviews'
@@ -112,49 +150,340 @@ class Review(db.Model):
     review_text = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     
-    # Index for optimizing reviews by book queries
-    __table_args__ = (db.Index('idx_reviews_book_id', 'book_id'),)
+    book = db.relationship('Book', back_populates='reviews')
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'book_id': self.book_id,
-            'reviewer_name': self.reviewer_name,
-            'rating': self.rating,
-            'review_text': self.review_text,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+    # Index for reviews-by-book queries; also covers the newest-first ordering,
+    # including the id tie-break, so no separate sort is needed
+    __table_args__ = (db.Index('idx_reviews_book_created_id', book_id, created_at.desc(), id.desc()),)
+
+# Read queries, built once and reused by every request
+ALL_BOOKS_STMT = db.select(*(getattr(Book, name) for name in BOOK_FIELDS))
+
+# Book columns plus review aggregates, computed in one GROUP BY rather than
+# a query per book. avg_rating is NULL for a book without reviews.
+BOOKS_WITH_REVIEW_STATS_STMT = (
+    db.select(
+        *(getattr(Book, name) for name in BOOK_FIELDS),
+        db.func.count(Review.id),
+        db.cast(db.func.avg(Review.rating), db.Float)
+    )
+    .outerjoin(Review, Review.book_id == Book.id)
+    .group_by(Book.id)
+)
+
+# One book's review count and average rating; no row if the book doesn't exist
+BOOK_REVIEW_STATS_STMT = (
+    db.select(db.func.count(Review.id), db.cast(db.func.avg(Review.rating), db.Float))
+    .select_from(Book)
+    .outerjoin(Review, Review.book_id == Book.id)
+    .where(Book.id == db.bindparam('book_id'))
+    .group_by(Book.id)
+)
+
+# Review columns in REVIEW_FIELDS order, then the book title. A book without
+# reviews comes back as one row with NULL review columns.
+REVIEWS_BY_BOOK_STMT = (
+    db.select(*(getattr(Review, name) for name in REVIEW_FIELDS), Book.title)
+    .outerjoin(Review, Review.book_id == Book.id)
+    .where(Book.id == db.bindparam('book_id'))
+    .order_by(Review.created_at.desc(), Review.id.desc())
+)
 
 #v Redis Cache keys
 BOOKS_CACHE_KEY = "books:all"
+BOOKS_REVIEW_STATS_CACHE_KEY = "books:all:review_stats"
 BOOK_CACHE_KEY_PREFIX = "book:"
-REVIEWS_CACHE_KEY_PREFIX = "reviews:book:"
+
+def reviews_cache_key(book_id: int) -> str:
+    # The {book:<id>} hash tag keeps all of a book's keys in one Redis Cluster slot
+    return f"reviews:{{book:{book_id}}}"
+
+# Process-local cache in front of Redis for hot keys. Repeat reads skip the
+# Redis round-trip; writes made through other processes can take up to
+# LOCAL_CACHE_TTL seconds to show up here.
+LOCAL_CACHE_TTL = 5
+local_cache = TTLCache(maxsize=1024, ttl=LOCAL_CACHE_TTL)
+local_cache_lock = threading.Lock()
 
 # Redis Cache helper functions
-def get_from_cache(key: str):
-    ttl = redis_client.ttl(BOOKS_CACHE_KEY)
-    print(f"TTL: {ttl}") 
+# Cached values are serialized JSON objects, returned to clients as-is
+def get_from_cache(key: str) -> Optional[bytes]:
+    with local_cache_lock:
+        body = local_cache.get(key)
+    if body is not None:
+        return body
+    
     try:
         cached_data = redis_client.get(key)
         if cached_data:
-            return json.loads(cached_data)
+            with local_cache_lock:
+                local_cache[key] = cached_data
+            return cached_data
     except Exception as e:
         app.logger.warning(f"Cache read error: {e}")
     return None
 
-def set_cache(key: str, data, expire_time: int = 10):
+def set_cache(key: str, body: bytes, expire_time: int = 10):
+    with local_cache_lock:
+        local_cache[key] = body
     try:
-        redis_client.setex(key, expire_time, json.dumps(data, default=str))
+        redis_client.setex(key, expire_time, body)
     except Exception as e:
         app.logger.warning(f"Cache write error: {e}")
 
-def invalidate_cache(pattern: str):
+# Deletes every key passed in KEYS, so related keys go in one atomic round-trip
+INVALIDATE_LUA = "for _, key in ipairs(KEYS) do redis.call('DEL', key) end"
+# register_script runs via EVALSHA and loads the script on first use
+invalidate_script = redis_client.register_script(INVALIDATE_LUA)
+
+def invalidate_cache(*keys: str):
+    with local_cache_lock:
+        for key in keys:
+            local_cache.pop(key, None)
     try:
-        if hasattr(redis_client, 'delete'):
-            redis_client.delete(pattern)
+        invalidate_script(keys=list(keys))
     except Exception as e:
         app.logger.warning(f"Cache invalidation error: {e}")
 
+# Write-through: inserts a serialized item into the list that opens a cached
+# body ({"<name>":[...]...}), at the head or, for single-field bodies, the tail.
+# The key keeps its remaining TTL; returns the new body, or nil if not cached.
+# ARGV[3..] are the items' '{"id":<id>,' prefixes (orjson writes id first): if
+# one is already there, a rebuild that ran after our commit has included the
+# items, and the body is returned unchanged rather than duplicating them.
+ADD_TO_LIST_LUA = """
+local body = redis.call('GET', KEYS[1])
+if not body then
+    return nil
+end
+for i = 3, #ARGV do
+    if string.find(body, ARGV[i], 1, true) then
+        return body
+    end
+end
+local start = string.find(body, '[', 1, true)
+local sep = ','
+if string.sub(body, start + 1, start + 1) == ']' then
+    sep = ''
+end
+if ARGV[2] == 'head' then
+    body = string.sub(body, 1, start) .. ARGV[1] .. sep .. string.sub(body, start + 1)
+else
+    body = string.sub(body, 1, -3) .. sep .. ARGV[1] .. ']}'
+end
+redis.call('SET', KEYS[1], body, 'KEEPTTL')
+return body
+"""
+add_to_list_script = redis_client.register_script(ADD_TO_LIST_LUA)
+
+def add_to_cached_list(key: str, items: list, position: str = 'tail'):
+    """Add new items to a cached list body in place, so writes keep the cache warm"""
+    try:
+        # The script splices ARGV[1] in verbatim, so several items go in as one fragment
+        fragment = b','.join(dumps_json(item) for item in items)
+        id_prefixes = [f'{{"id":{item["id"]},' for item in items]
+        body = add_to_list_script(keys=[key], args=[fragment, position, *id_prefixes])
+    except Exception as e:
+        app.logger.warning(f"Cache write-through error: {e}")
+        invalidate_cache(key)
+        return
+    
+    with local_cache_lock:
+        if body is None:
+            local_cache.pop(key, None)
+        else:
+            local_cache[key] = body
+
+# Cache rebuild lock: only one request repopulates an expired key, the rest
+# wait briefly and re-read the cache instead of all hitting the database
+REBUILD_LOCK_TIMEOUT_MS = 2000
+REBUILD_WAIT_SECONDS = 0.05
+
+# Deletes the lock only if it still holds our token, so a slow request never
+# releases a lock that has since expired and been taken by another one
+UNLOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+unlock_script = redis_client.register_script(UNLOCK_LUA)
+
+def acquire_rebuild_lock(key: str) -> Optional[str]:
+    """Return a lock token, or None if another request is already rebuilding the key"""
+    token = uuid.uuid4().hex
+    try:
+        if redis_client.set(f"lock:{key}", token, nx=True, px=REBUILD_LOCK_TIMEOUT_MS):
+            return token
+        return None
+    except Exception as e:
+        app.logger.warning(f"Cache lock error: {e}")
+        # Redis is unavailable, so there is nothing to coordinate on
+        return ''
+
+def release_rebuild_lock(key: str, token: Optional[str]):
+    if not token:
+        return
+    try:
+        unlock_script(keys=[f"lock:{key}"], args=[token])
+    except Exception as e:
+        app.logger.warning(f"Cache unlock error: {e}")
+
+def get_or_build_cache(key: str, build) -> tuple:
+    """Return (body, source) for a cache key, calling build() for the body on a miss"""
+    body = get_from_cache(key)
+    if body is not None:
+        return body, 'cache'
+    
+    token = acquire_rebuild_lock(key)
+    if token is None:
+        # Another request holds the lock; give it a moment to populate the cache
+        time.sleep(REBUILD_WAIT_SECONDS)
+        body = get_from_cache(key)
+        if body is not None:
+            return body, 'cache'
+    
+    try:
+        body = build()
+        set_cache(key, body)
+        return body, 'database'
+    finally:
+        release_rebuild_lock(key, token)
+
+# Closing fragments that tag a serialized JSON object with where it came from
+SOURCE_SUFFIXES = {
+    'cache': b',"source":"cache"}',
+    'database': b',"source":"database"}',
+}
+
+def json_body_response(body: bytes, source: str):
+    """Return a serialized JSON object as the response, adding its source field"""
+    return app.response_class(body[:-1] + SOURCE_SUFFIXES[source], mimetype='application/json')
+
+# Request payload schemas, compiled into plain Python validators at import time.
+# Integer fields also accept numeric strings ("1999"), which are converted with
+# int() after validation; range checks happen then, so they cover both forms.
+# The digit count is bounded so int() never hits CPython's digit limit.
+INTEGER_STRING_PATTERN = r'^\s*[+-]?[0-9]{1,9}\s*$'
+
+BOOK_SCHEMA = {
+    'type': 'object',
+    'required': ['title', 'author'],
+    'properties': {
+        'title': {'type': 'string', 'pattern': r'\S'},
+        'author': {'type': 'string', 'pattern': r'\S'},
+        'isbn': {'type': ['string', 'null']},
+        'publication_year': {'type': ['integer', 'string', 'null'], 'pattern': INTEGER_STRING_PATTERN}
+    }
+}
+
+REVIEW_SCHEMA = {
+    'type': 'object',
+    'required': ['reviewer_name', 'rating'],
+    'properties': {
+        'reviewer_name': {'type': 'string', 'pattern': r'\S'},
+        'rating': {'type': ['integer', 'string'], 'pattern': INTEGER_STRING_PATTERN},
+        'review_text': {'type': ['string', 'null']}
+    }
+}
+
+validate_book = fastjsonschema.compile(BOOK_SCHEMA)
+validate_review = fastjsonschema.compile(REVIEW_SCHEMA)
+
+# Error messages by field, or by (field, failed rule) where they differ per rule
+BOOK_ERRORS = {
+    'title': "'title' is required and cannot be empty",
+    'author': "'author' is required and cannot be empty",
+    'isbn': "ISBN must be a string",
+    'publication_year': "Publication year must be a valid integer"
+}
+
+REVIEW_ERRORS = {
+    ('reviewer_name', 'required'): "'reviewer_name' is required",
+    'reviewer_name': "Reviewer name cannot be empty",
+    ('rating', 'required'): "'rating' is required",
+    'rating': "Rating must be a valid integer between 1 and 5",
+    'review_text': "Review text must be a string"
+}
+
+def validate_payload(validate, errors: dict, data):
+    """Run a compiled schema validator, raising BadRequest with a field-specific message"""
+    try:
+        validate(data)
+    except fastjsonschema.JsonSchemaValueException as e:
+        if e.rule == 'required':
+            field = next(name for name in e.definition['required'] if name not in data)
+        else:
+            field = e.path[1] if len(e.path) > 1 else None
+        raise BadRequest(errors.get((field, e.rule)) or errors.get(field) or e.message)
+
+def book_values(data) -> dict:
+    """Validate a book payload and return the column values to insert"""
+    validate_payload(validate_book, BOOK_ERRORS, data)
+    
+    # int() normalizes numeric strings and integral floats such as 1999.0
+    publication_year = data.get('publication_year')
+    if publication_year is not None:
+        publication_year = int(publication_year)
+        # The upper bound moves with the calendar, so it isn't part of the schema
+        if publication_year < 0 or publication_year > get_max_publication_year():
+            raise BadRequest("Invalid publication year")
+    
+    return {
+        'title': data['title'].strip(),
+        'author': data['author'].strip(),
+        'isbn': (data.get('isbn') or '').strip() or None,
+        'publication_year': publication_year
+    }
+
+def review_values(book_id: int, data) -> dict:
+    """Validate a review payload and return the column values to insert"""
+    validate_payload(validate_review, REVIEW_ERRORS, data)
+    
+    rating = int(data['rating'])
+    if not 1 <= rating <= 5:
+        raise BadRequest("Rating must be between 1 and 5")
+    
+    return {
+        'book_id': book_id,
+        'reviewer_name': data['reviewer_name'].strip(),
+        'rating': rating,
+        'review_text': (data.get('review_text') or '').strip() or None
+    }
+
+# Largest list a bulk request may send, bounding the size of one executemany
+MAX_BULK_ITEMS = 100
+
+def bulk_items(data, name: str, to_values) -> list:
+    """Validate every item of a bulk payload's list, returning their column values"""
+    items = data.get(name) if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise BadRequest(f"'{name}' must be a non-empty list")
+    if len(items) > MAX_BULK_ITEMS:
+        raise BadRequest(f"'{name}' can contain at most {MAX_BULK_ITEMS} items")
+    
+    values = []
+    for index, item in enumerate(items):
+        try:
+            values.append(to_values(item))
+        except BadRequest as e:
+            raise BadRequest(f"{name}[{index}]: {e.description}")
+    return values
+
+# Latest accepted publication year (next year), recomputed at most hourly
+MAX_YEAR_REFRESH_SECONDS = 3600
+# (monotonic time it was computed, year)
+max_publication_year = (float('-inf'), 0)
+
+def get_max_publication_year() -> int:
+    global max_publication_year
+    computed_at, year = max_publication_year
+    now = time.monotonic()
+    if now - computed_at >= MAX_YEAR_REFRESH_SECONDS:
+        year = datetime.now(timezone.utc).year + 1
+        max_publication_year = (now, year)
+    return year
+
 # Error handlers
 @app.errorhandler(400)
 def bad_request(error):
@@ -179,6 +508,13 @@ def get_books():
       - Books
     summary: List all books
     description: Retrieve a list of all books in the database with caching support
+    parameters:
+      - in: query
+        name: include
+        type: string
+        enum: [review_stats]
+        required: false
+        description: Add review_count and avg_rating to each book
     responses:
       200:
         description: Successfully retrieved books
@@ -214,11 +550,30 @@ def get_books():
                     type: string
                     format: date-time
                     description: Creation timestamp
-                    example: "2023-01-15T10:30:00+00:00"
+                    example: "2023-01-15T10:30:00Z"
+                  review_count:
+                    type: integer
+                    description: Number of reviews (only with include=review_stats)
+                    example: 3
+                  avg_rating:
+                    type: number
+                    description: Average rating, null without reviews (only with include=review_stats)
+                    example: 4.3
             source:
               type: string
               description: Data source (cache or database)
               example: "cache"
+      400:
+        description: Unsupported include value
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Bad request"
+            message:
+              type: string
+              example: "Unsupported include 'reviews'"
       500:
         description: Internal server error
         schema:
@@ -231,25 +586,43 @@ def get_books():
               type: string
               example: "An unexpected error occurred"
     """
+    include = request.args.get('include')
+    if include == 'review_stats':
+        return get_books_with_review_stats()
+    if include:
+        raise BadRequest(f"Unsupported include '{include}'")
+    
     try:
-        # Try to get from cache first
-        cached_books = get_from_cache(BOOKS_CACHE_KEY)
-        if cached_books is not None:
-            return jsonify({'books': cached_books, 'source': 'cache'})
-        
-        # Cache miss - fetch from database
-        books = db.session.execute(db.select(Book)).scalars().all()
-        books_data = [book.to_dict() for book in books]
-        
-        # Populate cache
-        set_cache(BOOKS_CACHE_KEY, books_data)
+        def load_books() -> bytes:
+            # Fetch only the response columns as plain rows (no ORM instances)
+            rows = db.session.execute(ALL_BOOKS_STMT).all()
+            books_data = [dict(zip(BOOK_FIELDS, row)) for row in rows]
+            # Cache the serialized body so hits skip parsing and re-encoding
+            return dumps_json({'books': books_data})
         
-        return jsonify({'books': books_data, 'source': 'database'})
+        return json_body_response(*get_or_build_cache(BOOKS_CACHE_KEY, load_books))
     
     except Exception as e:
         app.logger.error(f"Error fetching books: {e}")
         raise InternalServerError("Failed to fetch books")
 
+def get_books_with_review_stats():
+    """Book list with review_count and avg_rating for each book, cached separately"""
+    try:
+        def load_books() -> bytes:
+            rows = db.session.execute(BOOKS_WITH_REVIEW_STATS_STMT).all()
+            books_data = [
+                {**dict(zip(BOOK_FIELDS, row)), 'review_count': review_count, 'avg_rating': avg_rating}
+                for *row, review_count, avg_rating in rows
+            ]
+            return dumps_json({'books': books_data})
+        
+        return json_body_response(*get_or_build_cache(BOOKS_REVIEW_STATS_CACHE_KEY, load_books))
+    
+    except Exception as e:
+        app.logger.error(f"Error fetching books with review stats: {e}")
+        raise InternalServerError("Failed to fetch books")
+
 @app.route('/books', methods=['POST'])
 def add_book():
     """
@@ -316,7 +689,7 @@ def add_book():
                 created_at:
                   type: string
                   format: date-time
-                  example: "2023-01-15T10:30:00+00:00"
+                  example: "2023-01-15T10:30:00Z"
       400:
         description: Bad request - validation error
         schema:
@@ -349,45 +722,28 @@ def add_book():
         if not data:
             raise BadRequest("No JSON data provided")
         
-        # Validate required fields
-        required_fields = ['title', 'author']
-        for field in required_fields:
-            if field not in data or not data[field].strip():
-                raise BadRequest(f"'{field}' is required and cannot be empty")
-        
-        # Validate rating if provided
-        if 'publication_year' in data and data['publication_year']:
-            try:
-                year = int(data['publication_year'])
-                if year < 0 or year > datetime.now(timezone.utc).year + 1:
-                    raise BadRequest("Invalid publication year")
-                data['publication_year'] = year
-            except ValueError:
-                raise BadRequest("Publication year must be a valid integer")
-        
-        # Check for duplicate ISBN if provided
-        if data.get('isbn'):
-            existing_book = Book.query.filter_by(isbn=data['isbn']).first()
-            if existing_book:
-                raise BadRequest(f"Book with ISBN '{data['isbn']}' already exists")
-        
         # Create new book
-        book = Book(
-            title=data['title'].strip(),
-            author=data['author'].strip(),
-            isbn=data.get('isbn', '').strip() or None,
-            publication_year=data.get('publication_year')
-        )
+        values = book_values(data)
         
-        db.session.add(book)
-        db.session.commit()
+        # Single-row Core insert (no ORM flush); RETURNING hands back the generated columns.
+        # Duplicate ISBNs are rejected by the unique constraint on insert
+        try:
+            book_id, created_at = db.session.execute(
+                db.insert(Book).values(**values).returning(Book.id, Book.created_at)
+            ).one()
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise BadRequest(f"Book with ISBN '{values['isbn']}' already exists")
         
-        # Invalidate books cache
-        invalidate_cache(BOOKS_CACHE_KEY)
+        # Append the new book to the cached list rather than dropping it
+        book = {'id': book_id, **values, 'created_at': created_at}
+        add_to_cached_list(BOOKS_CACHE_KEY, [book])
+        invalidate_cache(BOOKS_REVIEW_STATS_CACHE_KEY)
         
         return jsonify({
             'message': 'Book added successfully',
-            'book': book.to_dict()
+            'book': book
         }), 201
     
     except BadRequest:
@@ -397,6 +753,139 @@ def add_book():
         app.logger.error(f"Error adding book: {e}")
         raise InternalServerError("Failed to add book")
 
+@app.route('/books/bulk', methods=['POST'])
+def add_books_bulk():
+    """
+    Add several books at once
+    ---
+    tags:
+      - Books
+    summary: Create books in bulk
+    description: Add a list of books in a single request and transaction. If any book is invalid or has a duplicate ISBN, none are added.
+    parameters:
+      - in: body
+        name: books
+        description: Books to be created
+        required: true
+        schema:
+          type: object
+          required:
+            - books
+          properties:
+            books:
+              type: array
+              maxItems: 100
+              items:
+                type: object
+                required:
+                  - title
+                  - author
+                properties:
+                  title:
+                    type: string
+                    example: "To Kill a Mockingbird"
+                  author:
+                    type: string
+                    example: "Harper Lee"
+                  isbn:
+                    type: string
+                    example: "978-0-06-112008-4"
+                  publication_year:
+                    type: integer
+                    example: 1960
+    responses:
+      201:
+        description: Books created successfully
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: "2 books added successfully"
+            books:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                    example: 1
+                  title:
+                    type: string
+                    example: "To Kill a Mockingbird"
+                  author:
+                    type: string
+                    example: "Harper Lee"
+                  isbn:
+                    type: string
+                    example: "978-0-06-112008-4"
+                  publication_year:
+                    type: integer
+                    example: 1960
+                  created_at:
+                    type: string
+                    format: date-time
+                    example: "2023-01-15T10:30:00Z"
+      400:
+        description: Bad request - validation error
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Bad request"
+            message:
+              type: string
+              example: "books[1]: 'title' is required and cannot be empty"
+      500:
+        description: Internal server error
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Internal server error"
+            message:
+              type: string
+              example: "An unexpected error occurred"
+    """
+    if not request.is_json:
+        return jsonify({'error': 'Unsupported Media Type. Content-Type must be application/json'}), 415
+    
+    try:
+        values = bulk_items(request.get_json(), 'books', book_values)
+        
+        # One executemany INSERT ... RETURNING in a single transaction; results come
+        # back in the same order as the parameter sets
+        try:
+            rows = db.session.execute(
+                db.insert(Book).returning(Book.id, Book.created_at, sort_by_parameter_order=True),
+                values
+            ).all()
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise BadRequest("One or more books have an ISBN that already exists")
+        
+        books = [
+            {'id': book_id, **book, 'created_at': created_at}
+            for book, (book_id, created_at) in zip(values, rows)
+        ]
+        add_to_cached_list(BOOKS_CACHE_KEY, books)
+        invalidate_cache(BOOKS_REVIEW_STATS_CACHE_KEY)
+        
+        return jsonify({
+            'message': f'{len(books)} books added successfully',
+            'books': books
+        }), 201
+    
+    except BadRequest:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error adding books in bulk: {e}")
+        raise InternalServerError("Failed to add books")
+
 @app.route('/books/<int:book_id>/reviews', methods=['GET'])
 def get_book_reviews(book_id: int):
     """
@@ -456,7 +945,7 @@ def get_book_reviews(book_id: int):
                     type: string
                     format: date-time
                     description: Review creation timestamp
-                    example: "2023-01-15T10:30:00+00:00"
+                    example: "2023-01-15T10:30:00Z"
             source:
               type: string
               description: Data source (cache or database)
@@ -485,41 +974,106 @@ def get_book_reviews(book_id: int):
               example: "An unexpected error occurred"
     """
     try:
-        # Check if book exists
-        book = db.session.get(Book, book_id)
-        if not book:
-            raise NotFound(f"Book with id {book_id} not found")
-        
-        # Try cache first
-        cache_key = f"{REVIEWS_CACHE_KEY_PREFIX}{book_id}"
-        cached_reviews = get_from_cache(cache_key)
-        if cached_reviews is not None:
-            return jsonify({
+        def load_reviews() -> bytes:
+            # Load the book title and its reviews as plain rows in a single query
+            rows = db.session.execute(REVIEWS_BY_BOOK_STMT, {'book_id': book_id}).all()
+            if not rows:
+                raise NotFound(f"Book with id {book_id} not found")
+            
+            # zip stops at the last review field, leaving out the trailing title
+            reviews_data = [dict(zip(REVIEW_FIELDS, row)) for row in rows if row.id is not None]
+            
+            # The cached body carries the book title, so cache hits skip the database
+            # reviews goes first so writes can insert into the cached list in place
+            return dumps_json({
+                'reviews': reviews_data,
                 'book_id': book_id,
-                'book_title': book.title,
-                'reviews': cached_reviews,
-                'source': 'cache'
+                'book_title': rows[0].title
             })
         
-        # Cache miss - fetch from database using optimized query with index
-        reviews = Review.query.filter_by(book_id=book_id).order_by(Review.created_at.desc()).all()
-        reviews_data = [review.to_dict() for review in reviews]
-        
-        # Populate cache
-        set_cache(cache_key, reviews_data)
+        cache_key = reviews_cache_key(book_id)
+        return json_body_response(*get_or_build_cache(cache_key, load_reviews))
+    
+    except NotFound:
+        raise
+    except Exception as e:
+        app.logger.error(f"Error fetching reviews for book {book_id}: {e}")
+        raise InternalServerError("Failed to fetch reviews")
+
+@app.route('/books/<int:book_id>/stats', methods=['GET'])
+def get_book_stats(book_id: int):
+    """
+    Get review statistics for a specific book
+    ---
+    tags:
+      - Reviews
+    summary: Review count and average rating for a book
+    description: Aggregates the book's reviews in the database without returning them
+    parameters:
+      - in: path
+        name: book_id
+        type: integer
+        required: true
+        description: Unique book identifier
+        example: 1
+    responses:
+      200:
+        description: Successfully computed review statistics
+        schema:
+          type: object
+          properties:
+            book_id:
+              type: integer
+              description: Book identifier
+              example: 1
+            review_count:
+              type: integer
+              description: Number of reviews
+              example: 3
+            avg_rating:
+              type: number
+              description: Average rating, null if the book has no reviews
+              example: 4.3
+      404:
+        description: Book not found
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Resource not found"
+            message:
+              type: string
+              example: "Book with id 1 not found"
+      500:
+        description: Internal server error
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Internal server error"
+            message:
+              type: string
+              example: "An unexpected error occurred"
+    """
+    try:
+        row = db.session.execute(BOOK_REVIEW_STATS_STMT, {'book_id': book_id}).first()
+        if row is None:
+            raise NotFound(f"Book with id {book_id} not found")
         
+        review_count, avg_rating = row
         return jsonify({
             'book_id': book_id,
-            'book_title': book.title,
-            'reviews': reviews_data,
-            'source': 'database'
+            'review_count': review_count,
+            'avg_rating': avg_rating
         })
     
     except NotFound:
         raise
     except Exception as e:
-        app.logger.error(f"Error fetching reviews for book {book_id}: {e}")
-        raise InternalServerError("Failed to fetch reviews")
+        app.logger.error(f"Error fetching review stats for book {book_id}: {e}")
+        raise InternalServerError("Failed to fetch review stats")
 
 @app.route('/books/<int:book_id>/reviews', methods=['POST'])
 def add_book_review(book_id: int):
@@ -591,7 +1145,7 @@ def add_book_review(book_id: int):
                 created_at:
                   type: string
                   format: date-time
-                  example: "2023-01-15T10:30:00+00:00"
+                  example: "2023-01-15T10:30:00Z"
       400:
         description: Bad request - validation error
         schema:
@@ -636,50 +1190,214 @@ def add_book_review(book_id: int):
         if not data:
             raise BadRequest("No JSON data provided")
         
-        # Validate required fields
-        required_fields = ['reviewer_name', 'rating']
-        for field in required_fields:
-            if field not in data:
-                raise BadRequest(f"'{field}' is required")
+        # Create new review with a single-row Core insert
+        values = review_values(book_id, data)
+        review_id, created_at = db.session.execute(
+            db.insert(Review).values(**values).returning(Review.id, Review.created_at)
+        ).one()
+        db.session.commit()
         
-        # Validate reviewer name
-        if not data['reviewer_name'].strip():
-            raise BadRequest("Reviewer name cannot be empty")
+        # Reviews are listed newest first, so the new one goes at the head
+        review = {'id': review_id, **values, 'created_at': created_at}
+        add_to_cached_list(reviews_cache_key(book_id), [review], position='head')
+        # Review counts and averages in the book list are now stale
+        invalidate_cache(BOOKS_REVIEW_STATS_CACHE_KEY)
         
-        # Validate rating
-        try:
-            rating = int(data['rating'])
-            if rating < 1 or rating > 5:
-                raise BadRequest("Rating must be between 1 and 5")
-        except (ValueError, TypeError):
-            raise BadRequest("Rating must be a valid integer between 1 and 5")
+        return jsonify({
+            'message': 'Review added successfully',
+            'review': review
+        }), 201
+    
+    except (NotFound, BadRequest):
+        raise
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Error adding review for book {book_id}: {e}")
+        raise InternalServerError("Failed to add review")
+
+@app.route('/books/<int:book_id>/reviews/bulk', methods=['POST'])
+def add_book_reviews_bulk(book_id: int):
+    """
+    Add several reviews for a specific book at once
+    ---
+    tags:
+      - Reviews
+    summary: Create reviews in bulk
+    description: Add a list of reviews for a specific book in a single request and transaction. If any review is invalid, none are added.
+    parameters:
+      - in: path
+        name: book_id
+        type: integer
+        required: true
+        description: Unique book identifier
+        example: 1
+      - in: body
+        name: reviews
+        description: Reviews to be created
+        required: true
+        schema:
+          type: object
+          required:
+            - reviews
+          properties:
+            reviews:
+              type: array
+              maxItems: 100
+              items:
+                type: object
+                required:
+                  - reviewer_name
+                  - rating
+                properties:
+                  reviewer_name:
+                    type: string
+                    example: "Jane Smith"
+                  rating:
+                    type: integer
+                    minimum: 1
+                    maximum: 5
+                    example: 4
+                  review_text:
+                    type: string
+                    example: "Great book with compelling characters and plot!"
+    responses:
+      201:
+        description: Reviews created successfully
+        schema:
+          type: object
+          properties:
+            message:
+              type: string
+              example: "3 reviews added successfully"
+            reviews:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                    example: 1
+                  book_id:
+                    type: integer
+                    example: 1
+                  reviewer_name:
+                    type: string
+                    example: "Jane Smith"
+                  rating:
+                    type: integer
+                    example: 4
+                  review_text:
+                    type: string
+                    example: "Great book with compelling characters and plot!"
+                  created_at:
+                    type: string
+                    format: date-time
+                    example: "2023-01-15T10:30:00Z"
+      400:
+        description: Bad request - validation error
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Bad request"
+            message:
+              type: string
+              example: "reviews[0]: Rating must be between 1 and 5"
+      404:
+        description: Book not found
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Resource not found"
+            message:
+              type: string
+              example: "Book with id 1 not found"
+      500:
+        description: Internal server error
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+              example: "Internal server error"
+            message:
+              type: string
+              example: "An unexpected error occurred"
+    """
+    if not request.is_json:
+        return jsonify({'error': 'Unsupported Media Type. Content-Type must be application/json'}), 415
+    
+    try:
+        # Check if book exists
+        book = db.session.get(Book, book_id)
+        if not book:
+            raise NotFound(f"Book with id {book_id} not found")
         
-        # Create new review
-        review = Review(
-            book_id=book_id,
-            reviewer_name=data['reviewer_name'].strip(),
-            rating=rating,
-            review_text=data.get('review_text', '').strip() or None
+        values = bulk_items(
+            request.get_json(), 'reviews', lambda item: review_values(book_id, item)
         )
         
-        db.session.add(review)
+        rows = db.session.execute(
+            db.insert(Review).returning(Review.id, Review.created_at, sort_by_parameter_order=True),
+            values
+        ).all()
         db.session.commit()
         
-        # Invalidate relevant caches
-        cache_key = f"{REVIEWS_CACHE_KEY_PREFIX}{book_id}"
-        invalidate_cache(cache_key)
+        reviews = [
+            {'id': review_id, **review, 'created_at': created_at}
+            for review, (review_id, created_at) in zip(values, rows)
+        ]
+        # Later rows are newer, so they go in front to keep the list newest first
+        add_to_cached_list(reviews_cache_key(book_id), reviews[::-1], position='head')
+        invalidate_cache(BOOKS_REVIEW_STATS_CACHE_KEY)
         
         return jsonify({
-            'message': 'Review added successfully',
-            'review': review.to_dict()
+            'message': f'{len(reviews)} reviews added successfully',
+            'reviews': reviews
         }), 201
     
     except (NotFound, BadRequest):
         raise
     except Exception as e:
         db.session.rollback()
-        app.logger.error(f"Error adding review for book {book_id}: {e}")
-        raise InternalServerError("Failed to add review")
+        app.logger.error(f"Error adding reviews in bulk for book {book_id}: {e}")
+        raise InternalServerError("Failed to add reviews")
+
+# Health probe results are reused for a short window so that frequent
+# load balancer checks don't each hit the database and Redis
+HEALTH_CACHE_SECONDS = 1.0
+# (monotonic time of the last probe, response payload, status code)
+last_health_check = (float('-inf'), None, None)
+
+def probe_health():
+    """Check the database and cache connections, returning (payload, status code)"""
+    try:
+        db.session.execute(text('SELECT 1'))
+        
+        cache_status = "connected"
+        try:
+            if hasattr(redis_client, 'ping'):
+                redis_client.ping()
+            else:
+                cache_status = "mock"
+        except:
+            cache_status = "disconnected"
+        
+        return {
+            'status': 'healthy',
+            'database': 'connected',
+            'cache': cache_status,
+            'timestamp': datetime.now(timezone.utc)
+        }, 200
+    except Exception as e:
+        return {
+            'status': 'unhealthy',
+            'error': str(e),
+            'timestamp': datetime.now(timezone.utc)
+        }, 500
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -708,7 +1426,7 @@ def health_check():
             timestamp:
               type: string
               format: date-time
-              example: "2023-01-15T10:30:00+00:00"
+              example: "2023-01-15T10:30:00Z"
       500:
         description: System is unhealthy
         schema:
@@ -723,41 +1441,25 @@ def health_check():
             timestamp:
               type: string
               format: date-time
-              example: "2023-01-15T10:30:00+00:00"
+              example: "2023-01-15T10:30:00Z"
     """
-    try:
-        db.session.execute(text('SELECT 1'))
-        
-        cache_status = "connected"
-        try:
-            if hasattr(redis_client, 'ping'):
-                redis_client.ping()
-            else:
-                cache_status = "mock"
-        except:
-            cache_status = "disconnected"
-        
-        return jsonify({
-            'status': 'healthy',
-            'database': 'connected',
-            'cache': cache_status,
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        })
-    except Exception as e:
-        return jsonify({
-            'status': 'unhealthy',
-            'error': str(e),
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }), 500
+    global last_health_check
+    checked_at, payload, status_code = last_health_check
+    now = time.monotonic()
+    
+    # Serve the last result to probes arriving within the cache window
+    if now - checked_at >= HEALTH_CACHE_SECONDS:
+        payload, status_code = probe_health()
+        last_health_check = (now, payload, status_code)
+    
+    return jsonify(payload), status_code
 
-# Initialize database tables
+# Initialize database tables once at deploy time (`flask init-db`), never per worker
+@app.cli.command('init-db')
 def init_db():
     """Initialize database tables"""
-    with app.app_context():
-        db.create_all()
-        print("Database tables created successfully!")
+    db.create_all()
+    print("Database tables created successfully!")
 
 if __name__ == '__main__':
-    # Initialize database when running directly
-    init_db()
     app.run(debug=True, host='0.0.0.0', port=8000)
\ No newline at end of file
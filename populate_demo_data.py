@@ -4,10 +4,35 @@ Run this script to populate the database with sample data for testing
 """
 import requests
 import json
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# orjson (already a service dependency) encodes and parses faster than the
+# stdlib json that requests uses; fall back to json if it isn't installed
+try:
+    import orjson
+    json_dumps, json_loads = orjson.dumps, orjson.loads
+except ImportError:
+    def json_dumps(data):
+        return json.dumps(data).encode()
+    json_loads = json.loads
 
 BASE_URL = "http://localhost:8000"
 
+# Requests are I/O bound and independent within each stage, so they run concurrently
+MAX_WORKERS = 16
+
+# One session for every call, so connections are pooled and kept alive between
+# requests (sized for the worker threads). Retries are handled by @retry below,
+# so the adapter itself doesn't retry.
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=MAX_WORKERS))
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=MAX_WORKERS))
+
 SAMPLE_BOOKS = [
     {
         "title": "The Great Gatsby",
@@ -54,10 +79,72 @@ SAMPLE_REVIEWS = [
     ("Jack Thompson", 3, "Decent read but overhyped in my opinion.")
 ]
 
+# Sample reviews are handed out in order, this many per book
+REVIEWS_PER_BOOK = 3
+
+# Responses worth retrying: rate limiting and transient gateway/availability errors
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# A POST that timed out, lost its connection or got a gateway error may already
+# have been committed, and reviews have no unique key, so POSTs are only retried
+# when the request never reached the service: no connection was made, or a 429
+POST_RETRY_STATUSES = {429}
+
+# Longest Retry-After wait honored, so one response can't stall the script
+MAX_RETRY_AFTER_SECONDS = 30
+
+def never_connected(error):
+    """True if a request failed before a connection to the service was established"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    # Other ConnectionErrors, such as 'Connection aborted', can come after the
+    # request was sent; only a failure to open the connection is safe
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def retry(max_attempts=5, base=0.1, cap=5.0):
+    """Retry an HTTP call, made as func(method, ...), on errors and retryable statuses.
+    
+    GETs are retried on any request error and on RETRY_STATUSES; other methods
+    only when no connection was made and on POST_RETRY_STATUSES.
+    
+    Waits use "full jitter" exponential backoff, a random delay between 0 and
+    min(cap, base * 2 ** attempt), so concurrent callers spread their retries
+    out instead of retrying in lockstep. A Retry-After header in seconds is
+    honored when present, up to MAX_RETRY_AFTER_SECONDS.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(method, *args, **kwargs):
+            is_get = method.upper() == "GET"
+            retry_statuses = RETRY_STATUSES if is_get else POST_RETRY_STATUSES
+            
+            for attempt in range(max_attempts):
+                is_last_attempt = attempt == max_attempts - 1
+                delay = random.uniform(0, min(cap, base * 2 ** attempt))
+                try:
+                    response = func(method, *args, **kwargs)
+                except requests.exceptions.RequestException as e:
+                    if is_last_attempt or not (is_get or never_connected(e)):
+                        raise
+                else:
+                    if response.status_code not in retry_statuses or is_last_attempt:
+                        return response
+                    retry_after = response.headers.get('Retry-After', '')
+                    if retry_after.isdigit():
+                        delay = min(int(retry_after), MAX_RETRY_AFTER_SECONDS)
+                time.sleep(delay)
+        return wrapper
+    return decorator
+
+@retry()
+def send_request(method, url, **kwargs):
+    return SESSION.request(method, url, **kwargs)
+
 def check_service_health():
     """Check if the service is running"""
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=5)
+        response = SESSION.get(f"{BASE_URL}/health", timeout=5)
         return response.status_code == 200
     except requests.exceptions.RequestException:
         return False
@@ -65,14 +152,15 @@ def check_service_health():
 def add_book(book_data):
     """Add a book to the service"""
     try:
-        response = requests.post(
+        response = send_request(
+            "POST",
             f"{BASE_URL}/books",
-            json=book_data,
+            data=json_dumps(book_data),
             headers={"Content-Type": "application/json"},
             timeout=10
         )
         if response.status_code == 201:
-            book_info = response.json()
+            book_info = json_loads(response.content)
             print(f"Added book: {book_data['title']} (ID: {book_info['book']['id']})")
             return book_info['book']['id']
         else:
@@ -82,6 +170,30 @@ def add_book(book_data):
         print(f"Error adding book {book_data['title']}: {e}")
         return None
 
+def add_books_bulk(books):
+    """Add several books in one request; returns their IDs, or None if the service has no bulk endpoint"""
+    try:
+        response = send_request(
+            "POST",
+            f"{BASE_URL}/books/bulk",
+            data=json_dumps({"books": books}),
+            headers={"Content-Type": "application/json"},
+            timeout=10
+        )
+        if response.status_code == 404:
+            return None
+        if response.status_code == 201:
+            added = json_loads(response.content)['books']
+            for book in added:
+                print(f"Added book: {book['title']} (ID: {book['id']})")
+            return [book['id'] for book in added]
+        else:
+            print(f"Failed to add books: {response.text}")
+            return []
+    except requests.exceptions.RequestException as e:
+        print(f"Error adding books: {e}")
+        return []
+
 def add_review(book_id, reviewer_name, rating, review_text):
     """Add a review for a book"""
     review_data = {
@@ -91,9 +203,10 @@ def add_review(book_id, reviewer_name, rating, review_text):
     }
     
     try:
-        response = requests.post(
+        response = send_request(
+            "POST",
             f"{BASE_URL}/books/{book_id}/reviews",
-            json=review_data,
+            data=json_dumps(review_data),
             headers={"Content-Type": "application/json"},
             timeout=10
         )
@@ -107,12 +220,50 @@ def add_review(book_id, reviewer_name, rating, review_text):
         print(f"Error adding review by {reviewer_name}: {e}")
         return False
 
+def add_reviews_bulk(book_id, reviews):
+    """Add several reviews for a book in one request; returns how many were added, or None if the service has no bulk endpoint"""
+    review_data = [
+        {"reviewer_name": reviewer_name, "rating": rating, "review_text": review_text}
+        for reviewer_name, rating, review_text in reviews
+    ]
+    
+    try:
+        response = send_request(
+            "POST",
+            f"{BASE_URL}/books/{book_id}/reviews/bulk",
+            data=json_dumps({"reviews": review_data}),
+            headers={"Content-Type": "application/json"},
+            timeout=10
+        )
+        if response.status_code == 404:
+            return None
+        if response.status_code == 201:
+            for reviewer_name, rating, _ in reviews:
+                print(f"Added review by {reviewer_name} for book ID {book_id} (Rating: {rating}/5)")
+            return len(reviews)
+        else:
+            print(f"Failed to add reviews for book ID {book_id}: {response.text}")
+            return 0
+    except requests.exceptions.RequestException as e:
+        print(f"Error adding reviews for book ID {book_id}: {e}")
+        return 0
+
+def add_book_reviews(book_id, reviews):
+    """Add a book's reviews in one bulk request, falling back to one request per review"""
+    added = add_reviews_bulk(book_id, reviews)
+    if added is None:
+        added = sum(add_review(book_id, *review) for review in reviews)
+    return added
+
 def get_books():
-    """Get all books from the service"""
+    """Get all books from the service, with each book's review_count and avg_rating"""
+    # The whole list is parsed in one go, which is fine at demo scale. Past ~10k
+    # books, stream it instead (stream=True plus ijson.items(response.raw,
+    # 'books.item')) and have callers iterate rather than index or len() it.
     try:
-        response = requests.get(f"{BASE_URL}/books", timeout=10)
+        response = send_request("GET", f"{BASE_URL}/books", params={"include": "review_stats"}, timeout=10)
         if response.status_code == 200:
-            return response.json()['books']
+            return json_loads(response.content)['books']
         else:
             print(f"Failed to get books: {response.text}")
             return []
@@ -123,9 +274,9 @@ def get_books():
 def get_book_reviews(book_id):
     """Get reviews for a specific book"""
     try:
-        response = requests.get(f"{BASE_URL}/books/{book_id}/reviews", timeout=10)
+        response = send_request("GET", f"{BASE_URL}/books/{book_id}/reviews", timeout=10)
         if response.status_code == 200:
-            return response.json()['reviews']
+            return json_loads(response.content)['reviews']
         else:
             print(f"Failed to get reviews for book {book_id}: {response.text}")
             return []
@@ -133,6 +284,22 @@ def get_book_reviews(book_id):
         print(f"Error getting reviews for book {book_id}: {e}")
         return []
 
+def fill_review_stats(books):
+    """Compute review_count and avg_rating for books the service returned without them
+    
+    Services without include=review_stats ignore it; their books' reviews are
+    fetched concurrently and aggregated here instead.
+    """
+    missing = [book for book in books if 'review_count' not in book]
+    if not missing:
+        return
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        all_reviews = executor.map(get_book_reviews, [book['id'] for book in missing])
+        for book, reviews in zip(missing, all_reviews):
+            book['review_count'] = len(reviews)
+            book['avg_rating'] = sum(r['rating'] for r in reviews) / len(reviews) if reviews else None
+
 def main():
     """Main function to populate demo data"""
     print("🚀 Book Review Service - Demo Data Population")
@@ -146,14 +313,12 @@ def main():
         return
     print("Service is healthy and ready!")
     
-    # Add books
+    # Add books in one request, or concurrently one by one if there is no bulk endpoint
     print("\nAdding sample books...")
-    book_ids = []
-    for book in SAMPLE_BOOKS:
-        book_id = add_book(book)
-        if book_id:
-            book_ids.append(book_id)
-        time.sleep(0.5)  # Small delay
+    book_ids = add_books_bulk(SAMPLE_BOOKS)
+    if book_ids is None:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            book_ids = [book_id for book_id in executor.map(add_book, SAMPLE_BOOKS) if book_id]
     
     if not book_ids:
         print("No books were added successfully!")
@@ -161,35 +326,34 @@ def main():
     
     print(f"\nSuccessfully added {len(book_ids)} books!")
     
-    # Add reviews
+    # Add reviews, one bulk request per book
     print("\nAdding sample reviews...")
-    review_count = 0
+    reviews = SAMPLE_REVIEWS[:REVIEWS_PER_BOOK * len(book_ids)]
+    pairs = [(book_ids[i // REVIEWS_PER_BOOK], review) for i, review in enumerate(reviews)]
+    reviews_by_book = {}
+    for book_id, review in pairs:
+        reviews_by_book.setdefault(book_id, []).append(review)
     
-    for i, book_id in enumerate(book_ids):
-        num_reviews = min(3, len(SAMPLE_REVIEWS) - review_count)
-        
-        for j in range(num_reviews):
-            if review_count < len(SAMPLE_REVIEWS):
-                reviewer_name, rating, review_text = SAMPLE_REVIEWS[review_count]
-                if add_review(book_id, reviewer_name, rating, review_text):
-                    review_count += 1
-                time.sleep(0.1)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        review_count = sum(executor.map(add_book_reviews, reviews_by_book.keys(), reviews_by_book.values()))
     
     print(f"\nSuccessfully added {review_count} reviews!")
     
     print("\nDemo Data Summary:")
     print("=" * 30)
     
+    # Review stats come with the book list, so no per-book requests are needed
+    # unless the service doesn't support them
     books = get_books()
+    fill_review_stats(books)
     total_reviews = 0
     
     for book in books:
-        reviews = get_book_reviews(book['id'])
-        total_reviews += len(reviews)
-        avg_rating = sum(r['rating'] for r in reviews) / len(reviews) if reviews else 0
+        total_reviews += book['review_count']
+        avg_rating = book['avg_rating'] or 0
         
         print(f"{book['title']} by {book['author']}")
-        print(f"   Reviews: {len(reviews)} | Average Rating: {avg_rating:.1f}/5")
+        print(f"   Reviews: {book['review_count']} | Average Rating: {avg_rating:.1f}/5")
     
     print(f"\nDemo data population complete!")
     print(f"   Total Books: {len(books)}")
@@ -2,42 +2,71 @@ import pytest
 import json
 import os
 import tempfile
-from app import app, db, Book, Review
+import fakeredis
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 class TestConfig:
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-@pytest.fixture
-def client():
-    """Create a test client with isolated database for each test"""
-    # Store original config
-    original_config = app.config.copy()
-    
-    # Apply test configuration
+# The engine is created when app.py is imported, so the test database has to be
+# chosen before that. An in-memory database is private to each process, which
+# keeps pytest-xdist workers (pytest -n auto) from sharing data
+os.environ['DATABASE_URL'] = TestConfig.SQLALCHEMY_DATABASE_URI
+
+from app import app, db, Book, Review, redis_client, local_cache
+
+@pytest.fixture(scope='session')
+def database():
+    """Create the schema once for the whole test session"""
     app.config.from_object(TestConfig)
     
-    with app.test_client() as client:
-        with app.app_context():
-            # Create fresh tables for each test
-            db.drop_all()
-            db.create_all()
-            
-            # Clear any cached data
-            from app import redis_client
-            if hasattr(redis_client, 'data'):
-                redis_client.data.clear()  # Clear mock Redis data
-            
-            yield client
-            
+    with app.app_context():
+        # pysqlite doesn't emit BEGIN itself, which breaks SAVEPOINT handling;
+        # take over transaction control so per-test rollbacks undo everything
+        @event.listens_for(db.engine, 'connect')
+        def disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+        
+        @event.listens_for(db.engine, 'begin')
+        def emit_begin(connection):
+            connection.exec_driver_sql('BEGIN')
+        
+        db.drop_all()
+        db.create_all()
+        yield
+        db.drop_all()
+
+@pytest.fixture
+def client(database, monkeypatch):
+    """Create a test client whose database and cache changes are discarded after each test"""
+    with app.app_context():
+        # Run each test inside a transaction on one connection. The app's commits
+        # and rollbacks only release or roll back SAVEPOINTs within it
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        app_session = db.session
+        db.session = scoped_session(sessionmaker(bind=connection, join_transaction_mode='create_savepoint'))
+        
+        # Give each test its own empty in-process Redis (fakeredis runs the Lua
+        # scripts too), so cached rows never outlive the rollback and no test
+        # touches a real Redis shared with other runs or xdist workers
+        pool = redis.ConnectionPool(connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer())
+        monkeypatch.setattr(redis_client, 'connection_pool', pool)
+        local_cache.clear()
+        
+        try:
+            with app.test_client() as client:
+                yield client
+        finally:
             # Cleanup after test
             db.session.remove()
-            db.drop_all()
-    
-    # Restore original config
-    app.config.clear()
-    app.config.update(original_config)
+            db.session = app_session
+            transaction.rollback()
+            connection.close()
 
 @pytest.fixture
 def sample_book_data():
@@ -49,6 +78,13 @@ def sample_book_data():
         'publication_year': 1925
     }
 
+@pytest.fixture
+def created_book_id(client, sample_book_data):
+    """Add the sample book and return its id"""
+    response = client.post('/books', json=sample_book_data)
+    assert response.status_code == 201
+    return response.get_json()['book']['id']
+
 @pytest.fixture
 def sample_review_data():
     """Sample review data for testing"""
@@ -65,18 +101,16 @@ class TestBooksAPI:
         """Test GET /books with no books in database"""
         response = client.get('/books')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'books' in data
         assert len(data['books']) == 0
         assert data['source'] == 'database'  # Cache miss on empty database
     
     def test_add_book_success(self, client, sample_book_data):
         """Test POST /books with valid data"""
-        response = client.post('/books', 
-                             data=json.dumps(sample_book_data),
-                             content_type='application/json')
+        response = client.post('/books', json=sample_book_data)
         assert response.status_code == 201
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'book' in data
         assert data['book']['title'] == sample_book_data['title']
         assert data['book']['author'] == sample_book_data['author']
@@ -88,41 +122,33 @@ class TestBooksAPI:
     def test_add_book_missing_title(self, client):
         """Test POST /books without required title"""
         invalid_data = {'author': 'Test Author'}
-        response = client.post('/books',
-                             data=json.dumps(invalid_data),
-                             content_type='application/json')
+        response = client.post('/books', json=invalid_data)
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'title' in data['message']
     
     def test_add_book_missing_author(self, client):
         """Test POST /books without required author"""
         invalid_data = {'title': 'Test Book'}
-        response = client.post('/books',
-                             data=json.dumps(invalid_data),
-                             content_type='application/json')
+        response = client.post('/books', json=invalid_data)
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'error' in data
         assert 'author' in data['message']
     
     def test_add_book_empty_title(self, client):
         """Test POST /books with empty title"""
         invalid_data = {'title': '   ', 'author': 'Test Author'}
-        response = client.post('/books',
-                             data=json.dumps(invalid_data),
-                             content_type='application/json')
+        response = client.post('/books', json=invalid_data)
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'title' in data['message']
     
     def test_add_book_duplicate_isbn(self, client, sample_book_data):
         """Test POST /books with duplicate ISBN"""
         # Add first book
-        response1 = client.post('/books',
-                               data=json.dumps(sample_book_data),
-                               content_type='application/json')
+        response1 = client.post('/books', json=sample_book_data)
         assert response1.status_code == 201
         
         # Try to add second book with same ISBN
@@ -130,11 +156,9 @@ class TestBooksAPI:
         duplicate_data['title'] = 'Different Title'
         duplicate_data['author'] = 'Different Author'
         
-        response2 = client.post('/books',
-                               data=json.dumps(duplicate_data),
-                               content_type='application/json')
+        response2 = client.post('/books', json=duplicate_data)
         assert response2.status_code == 400
-        data = json.loads(response2.data)
+        data = response2.get_json()
         assert 'ISBN' in data['message']
     
     def test_add_book_invalid_publication_year(self, client):
@@ -144,29 +168,79 @@ class TestBooksAPI:
             'author': 'Test Author',
             'publication_year': 'not_a_number'
         }
-        response = client.post('/books',
-                             data=json.dumps(invalid_data),
-                             content_type='application/json')
+        response = client.post('/books', json=invalid_data)
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'publication year' in data['message'].lower()
     
+    def test_add_book_publication_year_normalized(self, client):
+        """Test POST /books stores numeric-string and float years as integers"""
+        for title, year in (('String Year', '1999'), ('Float Year', 1999.0)):
+            response = client.post('/books', json={'title': title, 'author': 'Test Author', 'publication_year': year})
+            assert response.status_code == 201
+            assert response.get_json()['book']['publication_year'] == 1999
+            assert type(response.get_json()['book']['publication_year']) is int
+        
+        data = client.get('/books').get_json()
+        assert [book['publication_year'] for book in data['books']] == [1999, 1999]
+        assert all(type(book['publication_year']) is int for book in data['books'])
+    
+    def test_add_book_overlong_numeric_year(self, client):
+        """Test POST /books rejects a numeric-string year too long to convert"""
+        response = client.post('/books', json={'title': 'Test Book', 'author': 'Test Author',
+                                               'publication_year': '1' * 5000})
+        assert response.status_code == 400
+        assert 'publication year' in response.get_json()['message'].lower()
+    
+    def test_add_book_non_string_title(self, client):
+        """Test POST /books with a title of the wrong type"""
+        invalid_data = {'title': 123, 'author': 'Test Author'}
+        response = client.post('/books', json=invalid_data)
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'title' in data['message']
+    
     def test_get_books_with_data(self, client, sample_book_data):
         """Test GET /books after adding a book"""
         # Add a book first
-        add_response = client.post('/books',
-                                 data=json.dumps(sample_book_data),
-                                 content_type='application/json')
+        add_response = client.post('/books', json=sample_book_data)
         assert add_response.status_code == 201
         
         # Get all books
         response = client.get('/books')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert len(data['books']) == 1
         assert data['books'][0]['title'] == sample_book_data['title']
         assert data['books'][0]['author'] == sample_book_data['author']
 
+    def test_get_books_with_review_stats(self, client, sample_book_data):
+        """Test GET /books?include=review_stats adds review aggregates"""
+        response = client.post('/books', json=sample_book_data)
+        book_id = response.get_json()['book']['id']
+        client.post('/books', json={'title': 'No Reviews', 'author': 'Anon'})
+        for rating in (5, 4):
+            client.post(f'/books/{book_id}/reviews', json={'reviewer_name': 'Reader', 'rating': rating})
+        
+        response = client.get('/books?include=review_stats')
+        assert response.status_code == 200
+        books = {book['title']: book for book in response.get_json()['books']}
+        assert books[sample_book_data['title']]['review_count'] == 2
+        assert books[sample_book_data['title']]['avg_rating'] == 4.5
+        assert books['No Reviews']['review_count'] == 0
+        assert books['No Reviews']['avg_rating'] is None
+        
+        # A new review invalidates the cached stats
+        client.post(f'/books/{book_id}/reviews', json={'reviewer_name': 'Reader', 'rating': 3})
+        response = client.get('/books?include=review_stats')
+        books = {book['title']: book for book in response.get_json()['books']}
+        assert books[sample_book_data['title']]['review_count'] == 3
+    
+    def test_get_books_unsupported_include(self, client):
+        """Test GET /books with an unknown include value"""
+        response = client.get('/books?include=reviews')
+        assert response.status_code == 400
+
 class TestReviewsAPI:
     """Test cases for Reviews API endpoints"""
     
@@ -174,72 +248,44 @@ class TestReviewsAPI:
         """Test GET /books/{id}/reviews for non-existent book"""
         response = client.get('/books/999/reviews')
         assert response.status_code == 404
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'not found' in data['message']
     
     def test_add_review_nonexistent_book(self, client, sample_review_data):
         """Test POST /books/{id}/reviews for non-existent book"""
-        response = client.post('/books/999/reviews',
-                             data=json.dumps(sample_review_data),
-                             content_type='application/json')
+        response = client.post('/books/999/reviews', json=sample_review_data)
         assert response.status_code == 404
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'not found' in data['message']
     
-    def test_add_review_success(self, client, sample_book_data, sample_review_data):
+    def test_add_review_success(self, client, created_book_id, sample_review_data):
         """Test POST /books/{id}/reviews with valid data"""
-        # Add a book first
-        book_response = client.post('/books',
-                                  data=json.dumps(sample_book_data),
-                                  content_type='application/json')
-        assert book_response.status_code == 201
-        book_data = json.loads(book_response.data)
-        book_id = book_data['book']['id']
-        
         # Add a review
-        response = client.post(f'/books/{book_id}/reviews',
-                             data=json.dumps(sample_review_data),
-                             content_type='application/json')
+        response = client.post(f'/books/{created_book_id}/reviews', json=sample_review_data)
         assert response.status_code == 201
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'review' in data
         assert data['review']['rating'] == sample_review_data['rating']
         assert data['review']['reviewer_name'] == sample_review_data['reviewer_name']
-        assert data['review']['book_id'] == book_id
+        assert data['review']['book_id'] == created_book_id
         assert 'id' in data['review']
         assert 'created_at' in data['review']
     
-    def test_add_review_missing_reviewer_name(self, client, sample_book_data):
+    def test_add_review_missing_reviewer_name(self, client, created_book_id):
         """Test POST /books/{id}/reviews without reviewer name"""
-        # Add a book first
-        book_response = client.post('/books',
-                                  data=json.dumps(sample_book_data),
-                                  content_type='application/json')
-        book_data = json.loads(book_response.data)
-        book_id = book_data['book']['id']
-        
         # Try to add review without reviewer name
         invalid_review = {
             'rating': 4,
             'review_text': 'Test review'
         }
         
-        response = client.post(f'/books/{book_id}/reviews',
-                             data=json.dumps(invalid_review),
-                             content_type='application/json')
+        response = client.post(f'/books/{created_book_id}/reviews', json=invalid_review)
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'reviewer_name' in data['message']
     
-    def test_add_review_invalid_rating_high(self, client, sample_book_data):
+    def test_add_review_invalid_rating_high(self, client, created_book_id):
         """Test POST /books/{id}/reviews with rating too high"""
-        # Add a book first
-        book_response = client.post('/books',
-                                  data=json.dumps(sample_book_data),
-                                  content_type='application/json')
-        book_data = json.loads(book_response.data)
-        book_id = book_data['book']['id']
-        
         # Try to add review with invalid rating
         invalid_review = {
             'reviewer_name': 'Test Reviewer',
@@ -247,22 +293,13 @@ class TestReviewsAPI:
             'review_text': 'Test review'
         }
         
-        response = client.post(f'/books/{book_id}/reviews',
-                             data=json.dumps(invalid_review),
-                             content_type='application/json')
+        response = client.post(f'/books/{created_book_id}/reviews', json=invalid_review)
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'Rating must be between 1 and 5' in data['message']
     
-    def test_add_review_invalid_rating_low(self, client, sample_book_data):
+    def test_add_review_invalid_rating_low(self, client, created_book_id):
         """Test POST /books/{id}/reviews with rating too low"""
-        # Add a book first
-        book_response = client.post('/books',
-                                  data=json.dumps(sample_book_data),
-                                  content_type='application/json')
-        book_data = json.loads(book_response.data)
-        book_id = book_data['book']['id']
-        
         # Try to add review with invalid rating
         invalid_review = {
             'reviewer_name': 'Test Reviewer',
@@ -270,56 +307,144 @@ class TestReviewsAPI:
             'review_text': 'Test review'
         }
         
-        response = client.post(f'/books/{book_id}/reviews',
-                             data=json.dumps(invalid_review),
-                             content_type='application/json')
+        response = client.post(f'/books/{created_book_id}/reviews', json=invalid_review)
         assert response.status_code == 400
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'Rating must be between 1 and 5' in data['message']
     
-    def test_get_reviews_empty(self, client, sample_book_data):
-        """Test GET /books/{id}/reviews with no reviews"""
-        # Add a book first
-        book_response = client.post('/books',
-                                  data=json.dumps(sample_book_data),
-                                  content_type='application/json')
-        book_data = json.loads(book_response.data)
-        book_id = book_data['book']['id']
+    def test_add_review_numeric_string_rating(self, client, created_book_id):
+        """Test POST /books/{id}/reviews accepts a rating sent as a numeric string"""
+        response = client.post(f'/books/{created_book_id}/reviews', json={'reviewer_name': 'Test Reviewer', 'rating': '4'})
+        assert response.status_code == 201
+        assert response.get_json()['review']['rating'] == 4
         
+        response = client.post(f'/books/{created_book_id}/reviews', json={'reviewer_name': 'Test Reviewer', 'rating': '9'})
+        assert response.status_code == 400
+        assert 'Rating must be between 1 and 5' in response.get_json()['message']
+        
+        response = client.post(f'/books/{created_book_id}/reviews', json={'reviewer_name': 'Test Reviewer', 'rating': '4' * 5000})
+        assert response.status_code == 400
+        assert 'Rating must be' in response.get_json()['message']
+    
+    def test_get_reviews_empty(self, client, sample_book_data, created_book_id):
+        """Test GET /books/{id}/reviews with no reviews"""
         # Get reviews (should be empty)
-        response = client.get(f'/books/{book_id}/reviews')
+        response = client.get(f'/books/{created_book_id}/reviews')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'reviews' in data
         assert len(data['reviews']) == 0
-        assert data['book_id'] == book_id
+        assert data['book_id'] == created_book_id
         assert data['book_title'] == sample_book_data['title']
         assert data['source'] == 'database'  # Cache miss
     
-    def test_get_reviews_success(self, client, sample_book_data, sample_review_data):
+    def test_get_reviews_success(self, client, created_book_id, sample_review_data):
         """Test GET /books/{id}/reviews with existing reviews"""
-        # Add a book first
-        book_response = client.post('/books',
-                                  data=json.dumps(sample_book_data),
-                                  content_type='application/json')
-        book_data = json.loads(book_response.data)
-        book_id = book_data['book']['id']
-        
         # Add a review
-        review_response = client.post(f'/books/{book_id}/reviews',
-                                    data=json.dumps(sample_review_data),
-                                    content_type='application/json')
+        review_response = client.post(f'/books/{created_book_id}/reviews', json=sample_review_data)
         assert review_response.status_code == 201
         
         # Get reviews
-        response = client.get(f'/books/{book_id}/reviews')
+        response = client.get(f'/books/{created_book_id}/reviews')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert 'reviews' in data
         assert len(data['reviews']) == 1
         assert data['reviews'][0]['rating'] == sample_review_data['rating']
         assert data['reviews'][0]['reviewer_name'] == sample_review_data['reviewer_name']
-        assert data['book_id'] == book_id
+        assert data['book_id'] == created_book_id
+
+    def test_get_book_stats(self, client, created_book_id):
+        """Test GET /books/{id}/stats aggregates the book's reviews"""
+        response = client.get(f'/books/{created_book_id}/stats')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['review_count'] == 0
+        assert data['avg_rating'] is None
+        
+        for rating in (5, 2):
+            client.post(f'/books/{created_book_id}/reviews', json={'reviewer_name': 'Reader', 'rating': rating})
+        
+        response = client.get(f'/books/{created_book_id}/stats')
+        data = response.get_json()
+        assert data['book_id'] == created_book_id
+        assert data['review_count'] == 2
+        assert data['avg_rating'] == 3.5
+    
+    def test_get_book_stats_nonexistent_book(self, client):
+        """Test GET /books/{id}/stats for non-existent book"""
+        response = client.get('/books/999/stats')
+        assert response.status_code == 404
+
+class TestBulkAPI:
+    """Test cases for bulk insert endpoints"""
+    
+    def test_add_books_bulk_success(self, client, sample_book_data):
+        """Test POST /books/bulk with valid books"""
+        books = [sample_book_data, {'title': '1984', 'author': 'George Orwell'}]
+        response = client.post('/books/bulk', json={'books': books})
+        assert response.status_code == 201
+        data = response.get_json()
+        assert [book['title'] for book in data['books']] == [sample_book_data['title'], '1984']
+        assert all('id' in book and 'created_at' in book for book in data['books'])
+        
+        response = client.get('/books')
+        data = response.get_json()
+        assert len(data['books']) == 2
+    
+    def test_add_books_bulk_invalid_item(self, client, sample_book_data):
+        """Test POST /books/bulk rejects the whole batch if one book is invalid"""
+        books = [sample_book_data, {'author': 'No Title'}]
+        response = client.post('/books/bulk', json={'books': books})
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'books[1]' in data['message']
+        assert 'title' in data['message']
+        
+        response = client.get('/books')
+        data = response.get_json()
+        assert len(data['books']) == 0
+    
+    def test_add_books_bulk_too_many_items(self, client):
+        """Test POST /books/bulk rejects a batch over the size limit"""
+        from app import MAX_BULK_ITEMS
+        books = [{'title': f'Book {i}', 'author': 'Author'} for i in range(MAX_BULK_ITEMS + 1)]
+        response = client.post('/books/bulk', json={'books': books})
+        assert response.status_code == 400
+        assert 'at most' in response.get_json()['message']
+        assert client.get('/books').get_json()['books'] == []
+    
+    def test_add_books_bulk_duplicate_isbn(self, client, sample_book_data):
+        """Test POST /books/bulk with a duplicate ISBN in the batch"""
+        response = client.post('/books/bulk', json={'books': [sample_book_data, sample_book_data]})
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'ISBN' in data['message']
+    
+    def test_add_reviews_bulk_success(self, client, created_book_id, sample_review_data):
+        """Test POST /books/{id}/reviews/bulk with valid reviews"""
+        reviews = [sample_review_data, {'reviewer_name': 'Jane Smith', 'rating': 5}]
+        response = client.post(f'/books/{created_book_id}/reviews/bulk', json={'reviews': reviews})
+        assert response.status_code == 201
+        data = response.get_json()
+        assert len(data['reviews']) == 2
+        assert all(review['book_id'] == created_book_id for review in data['reviews'])
+        
+        response = client.get(f'/books/{created_book_id}/reviews')
+        data = response.get_json()
+        assert [review['reviewer_name'] for review in data['reviews']] == ['Jane Smith', 'John Doe']
+    
+    def test_add_reviews_bulk_no_content_type(self, client, created_book_id, sample_review_data):
+        """Test POST /books/{id}/reviews/bulk without a JSON content type"""
+        response = client.post(f'/books/{created_book_id}/reviews/bulk',
+                             data=json.dumps({'reviews': [sample_review_data]}),
+                             content_type='text/plain')
+        assert response.status_code == 415
+    
+    def test_add_reviews_bulk_nonexistent_book(self, client, sample_review_data):
+        """Test POST /books/{id}/reviews/bulk for non-existent book"""
+        response = client.post('/books/999/reviews/bulk', json={'reviews': [sample_review_data]})
+        assert response.status_code == 404
 
 class TestIntegrationCacheMiss:
     """Integration test covering cache-miss scenario"""
@@ -329,36 +454,32 @@ class TestIntegrationCacheMiss:
         # 1. Get books (cache miss - empty database)
         response = client.get('/books')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert len(data['books']) == 0
         assert data['source'] == 'database'  # Cache miss
         
         # 2. Add a book
-        book_response = client.post('/books',
-                                  data=json.dumps(sample_book_data),
-                                  content_type='application/json')
+        book_response = client.post('/books', json=sample_book_data)
         assert book_response.status_code == 201
-        book_data = json.loads(book_response.data)
+        book_data = book_response.get_json()
         book_id = book_data['book']['id']
         
         # 3. Get books again (should hit database due to cache invalidation)
         response = client.get('/books')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert len(data['books']) == 1
         assert data['books'][0]['title'] == sample_book_data['title']
     
         
         # 4. Add a review
-        review_response = client.post(f'/books/{book_id}/reviews',
-                                    data=json.dumps(sample_review_data),
-                                    content_type='application/json')
+        review_response = client.post(f'/books/{book_id}/reviews', json=sample_review_data)
         assert review_response.status_code == 201
         
         # 5. Get reviews again (should hit database due to cache invalidation)
         response = client.get(f'/books/{book_id}/reviews')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert len(data['reviews']) == 1
         assert data['reviews'][0]['rating'] == sample_review_data['rating']
         assert data['reviews'][0]['reviewer_name'] == sample_review_data['reviewer_name']
@@ -369,19 +490,120 @@ class TestCacheHitScenario:
     def test_books_cache_hit(self, client, sample_book_data):
         """Test that subsequent calls to GET /books hit the cache"""
         # Add a book
-        client.post('/books', data=json.dumps(sample_book_data), content_type='application/json')
+        client.post('/books', json=sample_book_data)
         
         # First call - should populate cache
         response1 = client.get('/books')
         assert response1.status_code == 200
-        data1 = json.loads(response1.data)
+        data1 = response1.get_json()
         assert data1['source'] == 'database'
         
-        # Second call - should hit cache (in mock environment, it will still show database)
+        # Second call - should hit cache (served from the process-local cache even without Redis)
         response2 = client.get('/books')
         assert response2.status_code == 200
-        data2 = json.loads(response2.data)
+        data2 = response2.get_json()
         assert len(data2['books']) == 1
+        assert data2['source'] == 'cache'
+
+class TestRedisCache:
+    """Test the Redis-side cache scripts: write-through splicing, rebuild lock and invalidation"""
+    
+    def cached_items(self, key, name):
+        """Parse the body cached in Redis, returning its list"""
+        body = redis_client.get(key)
+        assert body is not None
+        return json.loads(body)[name]
+    
+    def assert_cache_matches_database(self, client, url, key, name):
+        """The spliced body must equal a fresh rebuild from the database"""
+        from app import invalidate_cache
+        local_cache.clear()
+        cached = client.get(url).get_json()
+        assert cached['source'] == 'cache'
+        invalidate_cache(key)
+        rebuilt = client.get(url).get_json()
+        assert rebuilt['source'] == 'database'
+        assert cached[name] == rebuilt[name]
+    
+    def test_add_book_into_empty_cached_list(self, client, sample_book_data):
+        """Test POST /books splices the new book into a warm, empty books:all body"""
+        from app import BOOKS_CACHE_KEY
+        assert client.get('/books').get_json()['source'] == 'database'
+        
+        response = client.post('/books', json=sample_book_data)
+        book_id = response.get_json()['book']['id']
+        
+        books = self.cached_items(BOOKS_CACHE_KEY, 'books')
+        assert [book['id'] for book in books] == [book_id]
+        self.assert_cache_matches_database(client, '/books', BOOKS_CACHE_KEY, 'books')
+    
+    def test_add_books_appended_to_cached_list(self, client, sample_book_data):
+        """Test single and bulk POSTs append to the tail of a warm, non-empty books:all body"""
+        from app import BOOKS_CACHE_KEY
+        client.post('/books', json=sample_book_data)
+        client.get('/books')
+        
+        client.post('/books', json={'title': 'Second', 'author': 'Author'})
+        client.post('/books/bulk', json={'books': [{'title': 'Third', 'author': 'Author'},
+                                                   {'title': 'Fourth', 'author': 'Author'}]})
+        
+        books = self.cached_items(BOOKS_CACHE_KEY, 'books')
+        assert [book['title'] for book in books] == [sample_book_data['title'], 'Second', 'Third', 'Fourth']
+        self.assert_cache_matches_database(client, '/books', BOOKS_CACHE_KEY, 'books')
+    
+    def test_add_reviews_inserted_at_head_of_cached_list(self, client, created_book_id):
+        """Test review POSTs insert newest first into a warm reviews body, keeping its other fields"""
+        from app import reviews_cache_key
+        key = reviews_cache_key(created_book_id)
+        url = f'/books/{created_book_id}/reviews'
+        client.get(url)
+        assert self.cached_items(key, 'reviews') == []
+        
+        client.post(url, json={'reviewer_name': 'First', 'rating': 3})
+        client.post(url, json={'reviewer_name': 'Second', 'rating': 4})
+        client.post(f'{url}/bulk', json={'reviews': [{'reviewer_name': 'Third', 'rating': 5},
+                                                     {'reviewer_name': 'Fourth', 'rating': 2}]})
+        
+        reviews = self.cached_items(key, 'reviews')
+        assert [review['reviewer_name'] for review in reviews] == ['Fourth', 'Third', 'Second', 'First']
+        assert json.loads(redis_client.get(key))['book_id'] == created_book_id
+        self.assert_cache_matches_database(client, url, key, 'reviews')
+    
+    def test_write_through_skips_items_already_cached(self, client, sample_book_data):
+        """Test a rebuild that already picked up the new row doesn't get it spliced in twice"""
+        from app import BOOKS_CACHE_KEY, add_to_cached_list
+        client.get('/books')
+        book = client.post('/books', json=sample_book_data).get_json()['book']
+        body = redis_client.get(BOOKS_CACHE_KEY)
+        
+        # The writer's script runs again after the rebuild
+        add_to_cached_list(BOOKS_CACHE_KEY, [book])
+        assert redis_client.get(BOOKS_CACHE_KEY) == body
+        assert len(json.loads(body)['books']) == 1
+    
+    def test_rebuild_lock(self, client):
+        """Test the rebuild lock is exclusive and only released by its holder"""
+        from app import acquire_rebuild_lock, release_rebuild_lock
+        token = acquire_rebuild_lock('books:all')
+        assert token
+        assert acquire_rebuild_lock('books:all') is None
+        
+        release_rebuild_lock('books:all', 'not-the-token')
+        assert redis_client.get('lock:books:all') == token.encode()
+        
+        release_rebuild_lock('books:all', token)
+        assert redis_client.get('lock:books:all') is None
+        assert acquire_rebuild_lock('books:all')
+    
+    def test_invalidate_cache(self, client, created_book_id):
+        """Test a review write drops the cached review stats from Redis and the local cache"""
+        from app import BOOKS_REVIEW_STATS_CACHE_KEY
+        client.get('/books?include=review_stats')
+        assert redis_client.get(BOOKS_REVIEW_STATS_CACHE_KEY) is not None
+        
+        client.post(f'/books/{created_book_id}/reviews', json={'reviewer_name': 'Reader', 'rating': 5})
+        assert redis_client.get(BOOKS_REVIEW_STATS_CACHE_KEY) is None
+        assert BOOKS_REVIEW_STATS_CACHE_KEY not in local_cache
 
 class TestErrorHandling:
     """Test error handling scenarios"""
@@ -414,13 +636,22 @@ class TestHealthCheck:
         """Test health check endpoint"""
         response = client.get('/health')
         assert response.status_code == 200
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['status'] == 'healthy'
         assert 'database' in data
         assert data['database'] == 'connected'
         assert 'cache' in data
         assert data['cache'] in ['connected', 'mock', 'disconnected']
-        assert 'timestamp' in data
+        assert data['timestamp'].endswith('Z')  # Same UTC form as every other timestamp
+    
+    def test_health_check_reuses_recent_result(self, client):
+        """Test that probes within the cache window reuse the last result"""
+        response1 = client.get('/health')
+        response2 = client.get('/health')
+        assert response1.status_code == response2.status_code == 200
+        data1 = response1.get_json()
+        data2 = response2.get_json()
+        assert data1['timestamp'] == data2['timestamp']
 
 class TestEdgeCases:
     """Test edge cases and boundary conditions"""
@@ -431,36 +662,25 @@ class TestEdgeCases:
             'title': 'Minimal Book',
             'author': 'Test Author'
         }
-        response = client.post('/books',
-                             data=json.dumps(minimal_book),
-                             content_type='application/json')
+        response = client.post('/books', json=minimal_book)
         assert response.status_code == 201
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['book']['title'] == minimal_book['title']
         assert data['book']['author'] == minimal_book['author']
         assert data['book']['isbn'] is None
         assert data['book']['publication_year'] is None
     
-    def test_review_with_only_required_fields(self, client, sample_book_data):
+    def test_review_with_only_required_fields(self, client, created_book_id):
         """Test adding review with only required fields"""
-        # Add a book first
-        book_response = client.post('/books',
-                                  data=json.dumps(sample_book_data),
-                                  content_type='application/json')
-        book_data = json.loads(book_response.data)
-        book_id = book_data['book']['id']
-        
         # Add minimal review
         minimal_review = {
             'reviewer_name': 'Test Reviewer',
             'rating': 3
         }
         
-        response = client.post(f'/books/{book_id}/reviews',
-                             data=json.dumps(minimal_review),
-                             content_type='application/json')
+        response = client.post(f'/books/{created_book_id}/reviews', json=minimal_review)
         assert response.status_code == 201
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['review']['reviewer_name'] == minimal_review['reviewer_name']
         assert data['review']['rating'] == minimal_review['rating']
         assert data['review']['review_text'] is None